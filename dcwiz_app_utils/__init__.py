@@ -1,23 +1,64 @@
-from .app import get_config, get_router_maps, APIRouter
-from .auth import get_auth_service_client, get_app_or_auth_service_client
-from .cli import create_cli_main
-from .db import (
-    DBBase,
-    DBMixin,
-    WithDB,
-    WithAsyncDB,
-    db_session_from_config,
-    async_db_session_from_config,
-    redis_from_config,
-)
-from .error import ErrorSeverity, Error, DCWizServiceException
-from .api_proxy import APIProxy, get_api_proxy
-from .response import ResponseSchema, wrap_response
-from .log_formatter import initialize_logger
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .app import get_config, get_router_maps, get_router_maps_lazy, APIRouter
+    from .auth import get_auth_service_client, get_app_or_auth_service_client
+    from .cli import create_cli_main
+    from .db import (
+        DBBase,
+        DBMixin,
+        WithDB,
+        WithAsyncDB,
+        db_session_from_config,
+        async_db_session_from_config,
+        redis_from_config,
+        get_redis_client,
+    )
+    from .error import ErrorSeverity, Error, DCWizServiceException
+    from .api_proxy import (
+        APIProxy,
+        get_api_proxy,
+        warm_api_proxy,
+        close_api_proxies,
+    )
+    from .response import ResponseSchema, wrap_response
+    from .log_formatter import initialize_logger
+
+# Public names are resolved on first access so that importing a single helper
+# (e.g. DBBase in an alembic env) does not pull in pandas, httpx, fastapi, ...
+_LAZY = {
+    "get_config": ".app",
+    "get_router_maps": ".app",
+    "get_router_maps_lazy": ".app",
+    "APIRouter": ".app",
+    "get_auth_service_client": ".auth",
+    "get_app_or_auth_service_client": ".auth",
+    "create_cli_main": ".cli",
+    "DBBase": ".db",
+    "DBMixin": ".db",
+    "WithDB": ".db",
+    "WithAsyncDB": ".db",
+    "db_session_from_config": ".db",
+    "async_db_session_from_config": ".db",
+    "redis_from_config": ".db",
+    "get_redis_client": ".db",
+    "ErrorSeverity": ".error",
+    "Error": ".error",
+    "DCWizServiceException": ".error",
+    "APIProxy": ".api_proxy",
+    "get_api_proxy": ".api_proxy",
+    "warm_api_proxy": ".api_proxy",
+    "close_api_proxies": ".api_proxy",
+    "ResponseSchema": ".response",
+    "wrap_response": ".response",
+    "initialize_logger": ".log_formatter",
+}
 
 __all__ = [
     "get_config",
     "get_router_maps",
+    "get_router_maps_lazy",
     "APIRouter",
     "get_auth_service_client",
     "get_app_or_auth_service_client",
@@ -29,12 +70,34 @@ __all__ = [
     "db_session_from_config",
     "async_db_session_from_config",
     "redis_from_config",
+    "get_redis_client",
     "ErrorSeverity",
     "Error",
     "DCWizServiceException",
     "APIProxy",
     "get_api_proxy",
+    "warm_api_proxy",
+    "close_api_proxies",
     "ResponseSchema",
     "wrap_response",
     "initialize_logger",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    if not name.startswith("__"):
+        # Submodules (dcwiz_app_utils.db, .error, ...) as attributes of the package
+        try:
+            return import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import weakref
+from typing import Awaitable, Callable
+
+_callbacks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, list]" = (
+    weakref.WeakKeyDictionary()
+)
+_hooks: dict[object, object] = {}
+
+
+async def _shutdown_hook(loop_ref, token):
+    try:
+        yield
+    finally:
+        _hooks.pop(token, None)
+        loop = loop_ref()
+        callbacks = _callbacks.pop(loop, None) if loop is not None else None
+        for callback in callbacks or ():
+            try:
+                await callback(loop)
+            except Exception:
+                logging.exception("Failed to release event loop resources")
+
+
+def on_loop_shutdown(callback: Callable[[asyncio.AbstractEventLoop], Awaitable]):
+    """
+    Await callback(loop) when the running loop shuts down.
+
+    asyncio.run (and uvicorn, pytest-asyncio) close pending async generators before
+    closing the loop, so a generator parked on the loop is the hook used here.
+    Loops closed without shutdown_asyncgens() never run the callbacks.
+    :param callback: async callable; must not hold a strong reference to the loop
+    """
+    loop = asyncio.get_running_loop()
+    callbacks = _callbacks.get(loop)
+    if callbacks is None:
+        callbacks = _callbacks[loop] = []
+        token = object()
+        hook = _hooks[token] = _shutdown_hook(weakref.ref(loop), token)
+        try:
+            hook.asend(None).send(None)
+        except StopIteration:
+            pass
+    callbacks.append(callback)
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from logging.config import fileConfig
 from dynaconf import Dynaconf
 
@@ -11,11 +12,16 @@ def get_url_from_env():
     return f"postgresql+asyncpg://{user}:{password}@{server}/{db}"
 
 
+@lru_cache(maxsize=4)
+def _load_url(config_file: str, mtime: float) -> str:
+    config_dict = Dynaconf(settings_files=[config_file])
+    return config_dict["sqlalchemy.url"]
+
+
 def get_url():
     config_file = os.getenv("DCWIZ_APP_CONFIG", False)
     if config_file:
-        config_dict = Dynaconf(settings_files=[config_file])
-        return config_dict["sqlalchemy.url"]
+        return _load_url(config_file, os.path.getmtime(config_file))
     else:
         return get_url_from_env()
 
@@ -1,14 +1,21 @@
 import asyncio
 import contextlib
-import json
+import inspect
 import logging
+import time
+import weakref
+from collections import deque
+from collections.abc import Mapping
+from functools import partial, wraps
 
 import aiofiles
+import orjson
 
 from loguru import logger
 from random import uniform
 from typing import Union
 
+from ._loop import on_loop_shutdown
 from .error import (
     DCWizPlatformAPIException,
     DCWizServiceAPIException,
@@ -19,48 +26,135 @@ from .error import (
     ErrorSeverity,
     DCWizAuthException,
 )
-from httpx import AsyncClient, BasicAuth
-import pandas as pd
+from httpx import AsyncClient, BasicAuth, ConnectError, Headers, Limits, TransportError
 from cachetools import TTLCache, cached
 from cachetools.keys import hashkey
-from asyncache import cached as async_cached
 from dynaconf import Dynaconf
 
 EVENT_URL = "/task/{category}/api/task-manager/event/{event}"
+ARROW_STREAM_MIME = "application/vnd.apache.arrow.stream"
+_STREAM_CHUNK_SIZE = 64 * 1024
 
+_ABSOLUTE_URL_PREFIXES = ("http://", "https://")
+_MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Statuses worth retrying; 429/503 mean the request was not processed at all
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_UNPROCESSED_STATUSES = frozenset({429, 503})
 
-class _Alias:
-    def __init__(self, parent, name=None):
-        self.parent = parent
-        self.name = name
 
-    def request(self, *args, **kwargs):
-        if self.name:
-            return getattr(self.parent, f"{self.name}_request")(*args, **kwargs)
-        else:
-            return self.parent.request(*args, **kwargs)
+class _LoopState:
+    """
+    Proxies shared on one event loop, and the proxies holding a client on it
+    """
 
-    def parallel_request(self, *args, **kwargs):
-        if self.name:
-            return getattr(self.parent, f"{self.name}_parallel_request")(
-                *args, **kwargs
-            )
+    __slots__ = ("proxies", "owners")
+
+    def __init__(self):
+        self.proxies: dict[tuple, APIProxy] = {}
+        self.owners: weakref.WeakSet[APIProxy] = weakref.WeakSet()
+
+
+# Keyed by the loop object itself, so entries go away with their loop and a
+# recycled id() can never return a proxy bound to a dead loop
+_LOOP_STATE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+# Proxies fetched outside a running loop; their clients are still per loop
+_UNBOUND_PROXIES: dict[tuple, "APIProxy"] = {}
+
+
+async def _close_loop_clients(loop):
+    state = _LOOP_STATE.pop(loop, None)
+    if state is not None:
+        for proxy in list(state.owners):
+            await proxy.aclose()
+
+
+def _loop_state(loop) -> _LoopState:
+    """
+    State of the running loop; its clients are closed when the loop shuts down
+    """
+    state = _LOOP_STATE.get(loop)
+    if state is None:
+        state = _LOOP_STATE[loop] = _LoopState()
+        on_loop_shutdown(_close_loop_clients)
+    return state
+
+
+def _cacheable_check(func):
+    """
+    Predicate telling whether a call of func may be served from the cache.
+
+    Only functions with a ``method`` parameter are checked; calls passing a
+    mutating HTTP method there always go through. Other string arguments never
+    bypass the cache.
+    """
+    params = inspect.signature(func).parameters
+    if "method" not in params:
+        return None
+    positional = [
+        name
+        for name, p in params.items()
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    index = positional.index("method") if "method" in positional else None
+
+    def is_cacheable(args, kwargs) -> bool:
+        if index is not None and len(args) > index:
+            method = args[index]
         else:
-            return self.parent.parallel_request(*args, **kwargs)
+            method = kwargs.get("method")
+        return not (isinstance(method, str) and method.upper() in _MUTATING_METHODS)
 
-    def stream(self, *args, filename, **kwargs):
-        if self.name:
-            return getattr(self.parent, f"{self.name}_stream")(
-                *args, file=filename, **kwargs
+    return is_cacheable
+
+
+_SCALAR_TYPES = frozenset({str, int, float, bool, bytes, type(None)})
+
+
+def _can_retry(method: str, reason) -> bool:
+    """
+    Whether a failed request may be resent; mutating requests are only retried
+    when the server cannot have acted on them.
+    """
+    if method.upper() not in _MUTATING_METHODS:
+        return True
+    return reason in _UNPROCESSED_STATUSES or isinstance(reason, ConnectError)
+
+
+def _freeze(obj):
+    # Scalars keep their type in the key: 1 == 1.0 == True would otherwise collide
+    if obj.__class__ in _SCALAR_TYPES:
+        return obj.__class__, obj
+    if isinstance(obj, dict):
+        return tuple(
+            sorted(
+                ((_freeze(k), _freeze(v)) for k, v in obj.items()),
+                key=lambda i: repr(i[0]),
             )
-        else:
-            return self.parent.stream(*args, filename=filename, **kwargs)
+        )
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(x) for x in obj)
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(_freeze(x) for x in obj)
+    try:
+        hash(obj)
+    except TypeError:
+        return obj.__class__, repr(obj)
+    return obj.__class__, obj
 
-    def parallel_stream(self, *args, **kwargs):
-        if self.name:
-            return getattr(self.parent, f"{self.name}_parallel_stream")(*args, **kwargs)
-        else:
-            return self.parent.parallel_stream(*args, **kwargs)
+
+class _Alias:
+    __slots__ = ("request", "parallel_request", "_stream", "parallel_stream")
+
+    def __init__(self, request, parallel_request, stream, parallel_stream):
+        self.request = request
+        self.parallel_request = parallel_request
+        self._stream = stream
+        self.parallel_stream = parallel_stream
+
+    def stream(self, *args, filename, **kwargs):
+        return self._stream(*args, filename=filename, **kwargs)
 
     def get(self, *args, **kwargs):
         return self.request("GET", *args, **kwargs)
@@ -89,6 +183,28 @@ class APIProxy:
         "auth": "auth",  # authentication service
     }
 
+    __slots__ = (
+        "base_url",
+        "cache_ttl",
+        "cache_ttl_var",
+        "timeout",
+        "auth_info",
+        "verify",
+        "http2",
+        "retries",
+        "retry_backoff",
+        "retry_max_wait",
+        "max_rpm",
+        "_client",
+        "_client_loop",
+        "_sync_cache",
+        "_async_cache",
+        "_inflight",
+        "_window",
+        "__weakref__",
+        *ALIASES,
+    )
+
     def __init__(
         self,
         base_url: str,
@@ -97,6 +213,11 @@ class APIProxy:
         timeout=60,
         auth_info=None,
         verify=False,
+        http2=False,
+        retries=0,
+        retry_backoff=0.5,
+        retry_max_wait=8,
+        max_rpm=None,
     ):
         self.base_url = base_url.rstrip("/")
         self.cache_ttl = cache_ttl
@@ -104,23 +225,179 @@ class APIProxy:
         self.timeout = timeout
         self.auth_info = auth_info
         self.verify = verify
+        self.http2 = http2
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_max_wait = retry_max_wait
+        self.max_rpm = max_rpm
+        self._window: deque[float] = deque()
+        self._client = None
+        self._client_loop = None
+        if cache_ttl > 0:
+            ttl = cache_ttl + uniform(-0.5, 0.5) * cache_ttl_var
+            self._sync_cache = TTLCache(maxsize=1024, ttl=ttl)
+            self._async_cache = TTLCache(maxsize=1024, ttl=ttl)
+        else:
+            self._sync_cache = self._async_cache = None
+        self._inflight: dict[tuple, asyncio.Lock] = {}
 
+        aliases = {}
         for alias, name in self.ALIASES.items():
-            setattr(self, alias, _Alias(self, name))
+            if name not in aliases:
+                prefix = f"{name}_" if name else ""
+                aliases[name] = _Alias(
+                    getattr(self, f"{prefix}request"),
+                    getattr(self, f"{prefix}parallel_request"),
+                    getattr(self, f"{prefix}stream", self.stream),
+                    getattr(self, f"{prefix}parallel_stream", self.parallel_stream),
+                )
+            setattr(self, alias, aliases[name])
+
+    def _client_owner(self):
+        return self._client_loop() if self._client_loop is not None else None
+
+    def _get_client(self) -> AsyncClient:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        # A client's connections belong to the loop that opened them; a proxy used
+        # from another loop (e.g. a second asyncio.run) gets a fresh client
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_owner() is not loop
+        ):
+            if loop is None:
+                self._client_loop = None
+            else:
+                self._client_loop = weakref.ref(loop)
+                _loop_state(loop).owners.add(self)
+            self._client = AsyncClient(
+                timeout=self.timeout,
+                auth=self.auth_info,
+                verify=self.verify,
+                http2=self.http2,
+                limits=Limits(
+                    max_connections=200,
+                    max_keepalive_connections=100,
+                    keepalive_expiry=30,
+                ),
+            )
+        return self._client
+
+    async def warm(self, pool_size: int = 5):
+        client = self._get_client()
+        await asyncio.gather(
+            *(client.head(self.base_url) for _ in range(pool_size)),
+            return_exceptions=True,
+        )
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is None:
+            return
+        owner = self._client_owner()
+        # A client left over from another (usually finished) loop cannot be
+        # closed from here; it is only dropped
+        if owner is None or owner is asyncio.get_running_loop():
+            await client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
 
     @contextlib.asynccontextmanager
     async def client(self, client=None, bearer=None):
         if client:
             yield client
-        else:
+        elif bearer:
+            # Dedicated client carrying the bearer header, kept for callers that
+            # use this context manager directly.
             client = AsyncClient(
                 timeout=self.timeout,
                 auth=self.auth_info,
                 verify=self.verify,
-                headers={"Authorization": f"Bearer {bearer}"} if bearer else None,
+                headers={"Authorization": f"Bearer {bearer}"},
             )
             yield client
             await client.aclose()
+        else:
+            yield self._get_client()
+
+    def _full_url(self, url: str) -> str:
+        return url if url.startswith(_ABSOLUTE_URL_PREFIXES) else self.base_url + url
+
+    @staticmethod
+    def _auth_headers(headers, bearer):
+        if not bearer:
+            return headers
+        return {**(headers or {}), "Authorization": f"Bearer {bearer}"}
+
+    @staticmethod
+    def _encode_json(kwargs):
+        # orjson instead of httpx's stdlib json.dumps for request bodies
+        body = kwargs.pop("json", None)
+        if body is None:
+            return
+        kwargs["content"] = orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+        headers = Headers(kwargs.get("headers"))
+        headers.setdefault("Content-Type", "application/json")
+        kwargs["headers"] = headers
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        # Exponential backoff with jitter, stretched to the server's Retry-After;
+        # only our own backoff is capped, retrying earlier than asked is pointless
+        delay = self.retry_backoff * 2**attempt + uniform(0, self.retry_backoff)
+        delay = min(delay, self.retry_max_wait)
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        return delay
+
+    async def _throttle(self):
+        """
+        Wait until a request fits in the sliding one-minute window of max_rpm.
+        """
+        if not self.max_rpm:
+            return
+        window = self._window
+        while True:
+            now = time.monotonic()
+            while window and window[0] <= now - 60:
+                window.popleft()
+            if len(window) < self.max_rpm:
+                window.append(now)
+                return
+            await asyncio.sleep(window[0] + 60 - now)
+
+    async def _send(self, client, method, full_url, *args, **kwargs):
+        attempt = 0
+        while True:
+            await self._throttle()
+            try:
+                res = await client.request(method, full_url, *args, **kwargs)
+            except TransportError as e:
+                if attempt >= self.retries or not _can_retry(method, e):
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Retrying {method} {full_url} in {delay:.2f}s: {e!r}")
+            else:
+                if (
+                    attempt >= self.retries
+                    or res.status_code not in _RETRY_STATUSES
+                    or not _can_retry(method, res.status_code)
+                ):
+                    return res
+                delay = self._retry_delay(attempt, res)
+                logger.warning(
+                    f"Retrying {method} {full_url} in {delay:.2f}s: {res.status_code}"
+                )
+            attempt += 1
+            await asyncio.sleep(delay)
 
     async def _request(
         self,
@@ -131,22 +408,25 @@ class APIProxy:
         client=None,
         exception_class=DCWizAPIException,
         expect_json=True,
+        raw_response=False,
         **kwargs,
     ):
-        if "://" in url:
-            full_url = url
-        else:
-            full_url = f"{self.base_url}{url}"
-
-        async with self.client(client, bearer) as client:
-            res = await client.request(method, full_url, *args, **kwargs)
-            if res.status_code != 200:
-                logger.error(f"API Error: {method} {full_url}: {res.status_code}")
-                logger.debug(res.text)
-                raise exception_class(method=method, url=full_url, response=res)
-
+        full_url = self._full_url(url)
+
+        kwargs["headers"] = self._auth_headers(kwargs.get("headers"), bearer)
+        self._encode_json(kwargs)
+        client = client or self._get_client()
+        res = await self._send(client, method, full_url, *args, **kwargs)
+        if res.status_code != 200:
+            logger.error(f"API Error: {method} {full_url}: {res.status_code}")
+            # Decoding the body is deferred until a debug sink actually wants it
+            logger.opt(lazy=True).debug("{}", lambda: res.text)
+            raise exception_class(method=method, url=full_url, response=res)
+
+        if raw_response:
+            return res
         if expect_json:
-            return res.json()
+            return orjson.loads(res.content)
         else:
             return res.content
 
@@ -161,90 +441,169 @@ class APIProxy:
         exception_class=DCWizAPIException,
         **kwargs,
     ):
-        if "://" in url:
-            full_url = url
-        else:
-            full_url = f"{self.base_url}{url}"
+        full_url = self._full_url(url)
 
-        async with self.client(client, bearer) as client:
-            async with client.stream(method, full_url, *args, **kwargs) as res:
-                if res.status_code != 200:
-                    raise exception_class(method=method, url=full_url, response=res)
+        kwargs["headers"] = self._auth_headers(kwargs.get("headers"), bearer)
+        self._encode_json(kwargs)
+        client = client or self._get_client()
+        await self._throttle()
+        async with client.stream(method, full_url, *args, **kwargs) as res:
+            if res.status_code != 200:
+                await res.aread()
+                raise exception_class(method=method, url=full_url, response=res)
 
-                length = 0
-                async with aiofiles.open(filename, "wb") as f:
-                    async for data in res.aiter_bytes():
-                        length += len(data)
-                        await f.write(data)
+            length = 0
+            async with aiofiles.open(filename, "wb") as f:
+                # 64 KiB chunks keep the number of threaded file writes down
+                async for data in res.aiter_bytes(_STREAM_CHUNK_SIZE):
+                    length += len(data)
+                    await f.write(data)
 
         return length
 
+    @staticmethod
+    def _concat_indexed(frames, guessed_type=None):
+        import pandas as pd
+
+        if guessed_type is not None:
+            frames = [
+                r
+                if r.index.dtype == guessed_type
+                else r.set_axis(r.index.astype(guessed_type, copy=False), axis=0)
+                for r in frames
+            ]
+        return pd.concat(frames, axis=1, join="outer", sort=False, copy=False)
+
     @staticmethod
     def _merge_dataframe(df, on: str = None):
         if isinstance(df, dict):
-            df = list[df.values()]
+            df = list(df.values())
         if on != "_index":
             df = [r.set_index(on) for r in df]
+        guessed_type = next(
+            (r.index.dtype for r in df if r.index.dtype != object), None
+        )
+        return APIProxy._concat_indexed(df, guessed_type)
+
+    @staticmethod
+    def _to_dataframe(r, dtypes: dict = None):
+        import pandas as pd
+
+        if not isinstance(r, pd.DataFrame):
+            if isinstance(r, list) and r and isinstance(r[0], Mapping):
+                r = pd.DataFrame.from_records(r)
+            else:
+                # Scalar and nested lists keep the plain constructor's handling
+                r = pd.DataFrame.from_dict(r)
+        if dtypes:
+            # Endpoints do not all return every column; cast the ones present
+            dtypes = {k: v for k, v in dtypes.items() if k in r.columns}
+            if dtypes:
+                r = r.astype(dtypes, copy=False)
+        return r
+
+    @staticmethod
+    def _decode_arrow(content: bytes):
+        import pyarrow.ipc
+
+        return pyarrow.ipc.open_stream(content).read_all()
+
+    def _process_dataframe(self, df, merge_dataframe_on: str, dtypes: dict = None):
+        if not merge_dataframe_on:
+            if isinstance(df, list):
+                return [self._to_dataframe(r, dtypes) for r in df]
+            return {k: self._to_dataframe(v, dtypes) for k, v in df.items()}
+        # Convert, index and pick the index dtype in a single pass
+        frames = []
         guessed_type = None
-        for r in df:
-            if r.index.dtype != object:
+        for r in df if isinstance(df, list) else df.values():
+            r = self._to_dataframe(r, dtypes)
+            if merge_dataframe_on != "_index":
+                r = r.set_index(merge_dataframe_on)
+            if guessed_type is None and r.index.dtype != object:
                 guessed_type = r.index.dtype
-                break
-        if guessed_type:
-            for r in df:
-                r.index = r.index.astype(guessed_type, copy=False)
-        return pd.concat(df, axis=1)
-
-    def _process_dataframe(self, df, merge_dataframe_on: str):
-        if isinstance(df, list):
-            df = [pd.DataFrame.from_dict(r) for r in df]
+            frames.append(r)
+        return self._concat_indexed(frames, guessed_type)
+
+    @staticmethod
+    async def _single(requests, client, bearer, request_method, extra_kwargs):
+        if isinstance(requests, list):
+            key, (method, url, kwargs) = None, requests[0]
         else:
-            df = {k: pd.DataFrame.from_dict(v) for k, v in df.items()}
-        if merge_dataframe_on:
-            df = self._merge_dataframe(df, merge_dataframe_on)
-        return df
+            ((key, (method, url, kwargs)),) = requests.items()
+        try:
+            res = await request_method(
+                method, url, client=client, bearer=bearer, **kwargs, **extra_kwargs
+            )
+        except Exception as e:
+            # Match the error shape of the TaskGroup path
+            raise ExceptionGroup("unhandled errors in a TaskGroup", [e]) from None
+        return [res] if isinstance(requests, list) else {key: res}
+
+    @staticmethod
+    async def _drain(requests, call, workers: int):
+        # A fixed pool of workers pulls from one shared iterator, so only
+        # `workers` requests (and their response bodies) are in flight at once
+        items = iter(
+            requests.items() if isinstance(requests, dict) else enumerate(requests)
+        )
+        results = {}
+
+        async def worker():
+            for key, (method, url, kwargs) in items:
+                results[key] = await call(method, url, kwargs)
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(workers):
+                tg.create_task(worker())
+        if isinstance(requests, list):
+            return [results[i] for i in range(len(requests))]
+        return {k: results[k] for k in requests}
 
     async def _parallel(
         self,
         requests: Union[dict, list],
         bearer=None,
         request_method=None,
+        max_concurrency: int = None,
         **extra_kwargs,
     ):
+        """
+        :param max_concurrency: cap on requests in flight at once; unbounded by
+            default
+        """
+        if isinstance(requests, (list, dict)) and not requests:
+            return [] if isinstance(requests, list) else {}
+        client = self._get_client()
+        if isinstance(requests, (list, dict)) and len(requests) == 1:
+            return await self._single(
+                requests, client, bearer, request_method, extra_kwargs
+            )
+
+        def call(method, url, kwargs):
+            return request_method(
+                method, url, client=client, bearer=bearer, **kwargs, **extra_kwargs
+            )
+
+        if (
+            max_concurrency
+            and isinstance(requests, (list, dict))
+            and len(requests) > max_concurrency
+        ):
+            return await self._drain(requests, call, max_concurrency)
         if isinstance(requests, list):
-            async with self.client(bearer=bearer) as client:
-                async with asyncio.TaskGroup() as tg:
-                    tasks = [
-                        tg.create_task(
-                            request_method(
-                                method,
-                                url,
-                                client=client,
-                                bearer=bearer,
-                                **kwargs,
-                                **extra_kwargs,
-                            )
-                        )
-                        for method, url, kwargs in requests
-                    ]
-                return [t.result() for t in tasks]
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(call(method, url, kwargs))
+                    for method, url, kwargs in requests
+                ]
+            return [t.result() for t in tasks]
         elif isinstance(requests, dict):
-            async with self.client(bearer=bearer) as client:
-                async with asyncio.TaskGroup() as tg:
-                    tasks = {
-                        k: tg.create_task(
-                            request_method(
-                                method,
-                                url,
-                                client=client,
-                                bearer=bearer,
-                                **kwargs,
-                                **extra_kwargs,
-                            )
-                        )
-                        for k, (method, url, kwargs) in requests.items()
-                    }
-                return {k: t.result() for k, t in tasks.items()}
+            tasks = {}
+            async with asyncio.TaskGroup() as tg:
+                for k, (method, url, kwargs) in requests.items():
+                    tasks[k] = tg.create_task(call(method, url, kwargs))
+            return {k: t.result() for k, t in tasks.items()}
         else:
             raise DCWizServiceException(
                 message="Internal Error",
@@ -269,11 +628,42 @@ class APIProxy:
         )
         return await self._stream(method, url, *args, filename=filename, **kwargs)
 
-    async def utinni_request(self, method, url, *args, as_dataframe=False, **kwargs):
+    async def utinni_request(
+        self,
+        method,
+        url,
+        *args,
+        as_dataframe=False,
+        format="json",
+        dtypes: dict = None,
+        **kwargs,
+    ):
+        """
+        :param dtypes: column dtypes for the resulting DataFrame; skips inference
+            for the listed columns when as_dataframe is set
+        """
         kwargs["exception_class"] = kwargs.get("exception_class", DCWizDataAPIException)
-        res = await self.request(method, url, *args, **kwargs)
+        if format == "arrow":
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                "Accept": ARROW_STREAM_MIME,
+            }
+            response = await self.request(
+                method, url, *args, raw_response=True, **kwargs
+            )
+            media_type = response.headers.get("content-type", "").partition(";")[0]
+            # Servers without Arrow support fall back to JSON
+            if media_type.strip().lower() == ARROW_STREAM_MIME:
+                table = self._decode_arrow(response.content)
+                if as_dataframe:
+                    return self._to_dataframe(table.to_pandas(), dtypes)
+                # Same column-oriented shape as the JSON payload
+                return table.to_pydict()
+            res = orjson.loads(response.content)
+        else:
+            res = await self.request(method, url, *args, **kwargs)
         if as_dataframe:
-            res = pd.DataFrame.from_dict(res)
+            res = self._to_dataframe(res, dtypes)
         return res
 
     async def service_request(self, method, url, *args, **kwargs):
@@ -307,13 +697,14 @@ class APIProxy:
         requests: Union[dict, list],
         as_dataframe=False,
         merge_dataframe_on=None,
+        dtypes: dict = None,
         **kwargs,
     ):
         res = await self._parallel(
             requests, request_method=self.utinni_request, **kwargs
         )
         if as_dataframe or merge_dataframe_on:
-            res = self._process_dataframe(res, merge_dataframe_on)
+            res = self._process_dataframe(res, merge_dataframe_on, dtypes)
         return res
 
     async def service_parallel_request(
@@ -336,36 +727,70 @@ class APIProxy:
 
     @staticmethod
     def _cache_hash_key(*args, **kwargs):
-        args = tuple(json.dumps(a, default=str) for a in args)
-        kwargs = {k: json.dumps(v, default=str) for k, v in kwargs.items()}
-        return hashkey(*args, **kwargs)
+        return hashkey(
+            *(_freeze(a) for a in args), **{k: _freeze(v) for k, v in kwargs.items()}
+        )
 
     @property
     def cache(self):
-        if self.cache_ttl > 0:
-            return cached(
-                cache=TTLCache(
-                    maxsize=1024,
-                    ttl=self.cache_ttl + uniform(-0.5, 0.5) * self.cache_ttl_var,
-                ),
-                key=self._cache_hash_key,
-            )
-        else:
+        if self._sync_cache is None:
             return lambda func: func
 
+        def decorator(func):
+            cached_func = cached(
+                cache=self._sync_cache, key=partial(self._cache_hash_key, func)
+            )(func)
+
+            is_cacheable = _cacheable_check(func)
+            if is_cacheable is None:
+                return cached_func
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not is_cacheable(args, kwargs):
+                    return func(*args, **kwargs)
+                return cached_func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
     @property
     def async_cache(self):
-        if self.cache_ttl > 0:
-            return async_cached(
-                cache=TTLCache(
-                    maxsize=1024,
-                    ttl=self.cache_ttl + uniform(-0.5, 0.5) * self.cache_ttl_var,
-                ),
-                key=self._cache_hash_key,
-            )
-        else:
+        if self._async_cache is None:
             return lambda func: func
 
+        def decorator(func):
+            is_cacheable = _cacheable_check(func)
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if is_cacheable is not None and not is_cacheable(args, kwargs):
+                    return await func(*args, **kwargs)
+                key = self._cache_hash_key(func, *args, **kwargs)
+                try:
+                    return self._async_cache[key]
+                except KeyError:
+                    pass
+                # Concurrent misses on the same key wait for a single upstream call
+                lock = self._inflight.setdefault(key, asyncio.Lock())
+                try:
+                    async with lock:
+                        try:
+                            return self._async_cache[key]
+                        except KeyError:
+                            pass
+                        value = await func(*args, **kwargs)
+                        self._async_cache[key] = value
+                        return value
+                finally:
+                    if not lock.locked():
+                        self._inflight.pop(key, None)
+
+            return wrapper
+
+        return decorator
+
     @classmethod
     def from_config(cls, config: Dynaconf = None):
         if config is None:
@@ -373,27 +798,105 @@ class APIProxy:
 
             config = get_config()
 
-        username = config.get("platform.username", None)
+        settings = _platform_settings(config)
+        username = settings.pop("username")
+        password = settings.pop("password")
         if username:
-            auth_info = BasicAuth(username, config.platform.password)
+            auth_info = BasicAuth(username, password)
         else:
             auth_info = None
-        base_url = config.get("platform.base_url")
-        if not base_url:
+        if not settings["base_url"]:
             logging.error("platform.base_url is empty")
             raise ValueError("APIProxy base_url cannot be empty")
-        return cls(
-            base_url=base_url,
-            cache_ttl=config.get("platform.cache_ttl", 120),
-            cache_ttl_var=config.get("platform.cache_ttl_var", 60),
-            timeout=config.get("platform.timeout", 60),
-            verify=config.get("platform.verify", True),
-            auth_info=auth_info,
-        )
+        return cls(**settings, auth_info=auth_info)
+
+    def get(self, *args, **kwargs):
+        return self.request("GET", *args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self.request("POST", *args, **kwargs)
+
+    def put(self, *args, **kwargs):
+        return self.request("PUT", *args, **kwargs)
+
+    def patch(self, *args, **kwargs):
+        return self.request("PATCH", *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.request("DELETE", *args, **kwargs)
+
 
-    def __getattr__(self, item):
-        return getattr(_Alias(self), item)
+def _platform_settings(config: Dynaconf) -> dict:
+    """
+    APIProxy options from the platform.* settings, with the raw credentials
+    """
+    return dict(
+        base_url=config.get("platform.base_url"),
+        username=config.get("platform.username", None),
+        password=config.get("platform.password", None),
+        cache_ttl=config.get("platform.cache_ttl", 120),
+        cache_ttl_var=config.get("platform.cache_ttl_var", 60),
+        timeout=config.get("platform.timeout", 60),
+        verify=config.get("platform.verify", True),
+        http2=config.get("platform.http2", False),
+        retries=config.get("platform.retries", 0),
+        retry_backoff=config.get("platform.retry_backoff", 0.5),
+        retry_max_wait=config.get("platform.retry_max_wait", 8),
+        max_rpm=config.get("platform.max_rpm", None),
+    )
+
+
+def _shared_proxy(name: str, factory, **settings) -> APIProxy:
+    """
+    Proxy shared by every caller on the running event loop with the same settings
+    :param name: kind of proxy, keeps differently built proxies apart
+    :param factory: builds the proxy on first use
+    :param settings: everything the built proxy's behaviour depends on (base URL,
+        credentials, timeout, retries, rate limit, cache TTL, ...)
+    """
+    try:
+        proxies = _loop_state(asyncio.get_running_loop()).proxies
+    except RuntimeError:
+        proxies = _UNBOUND_PROXIES
+    key = (name, _freeze(settings))
+    proxy = proxies.get(key)
+    if proxy is None:
+        proxy = proxies[key] = factory()
+    return proxy
 
 
 def get_api_proxy(config: Dynaconf = None):
-    return APIProxy.from_config(config)
+    if config is None:
+        from .app import get_config
+
+        config = get_config()
+    return _shared_proxy(
+        "platform",
+        partial(APIProxy.from_config, config),
+        **_platform_settings(config),
+    )
+
+
+async def warm_api_proxy(config: Dynaconf = None):
+    if config is None:
+        from .app import get_config
+
+        config = get_config()
+    pool_size = config.get("platform.warm_pool_size", 0)
+    if pool_size and config.get("platform.base_url"):
+        await get_api_proxy(config).warm(pool_size)
+
+
+async def close_api_proxies():
+    """
+    Close the shared proxies of the running loop and those fetched outside a loop;
+    also done automatically when the loop shuts down through asyncio.run
+    """
+    proxies = set(_UNBOUND_PROXIES.values())
+    _UNBOUND_PROXIES.clear()
+    state = _LOOP_STATE.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        proxies.update(state.proxies.values())
+        proxies.update(state.owners)
+    for proxy in proxies:
+        await proxy.aclose()
@@ -1,14 +1,18 @@
 import pkgutil
+from functools import cache, partial
 from importlib import import_module
 
 from fastapi import APIRouter as APIRouterBase
 from dynaconf import Dynaconf
+from loguru import logger
 
 from .response import wrap_response
 
 
 config: Dynaconf = NotImplemented
 
+_ROUTER_MAP_CACHE: dict[tuple, dict] = {}
+
 
 def get_config() -> Dynaconf:
     global config
@@ -23,21 +27,38 @@ def set_config(_config: Dynaconf):
 
 
 def get_router_maps(_path, _name):
+    key = (tuple(_path), _name)
+    if key in _ROUTER_MAP_CACHE:
+        return dict(_ROUTER_MAP_CACHE[key])
     router_map = {}
+    for prefix, load in get_router_maps_lazy(_path, _name).items():
+        router = load()
+        if router:
+            router_map[prefix] = router
+    _ROUTER_MAP_CACHE[key] = router_map
+    return dict(router_map)
+
+
+def _load_router(module_name):
+    try:
+        return getattr(import_module(module_name), "router", None)
+    except Exception:
+        logger.exception(f"Failed to load router from {module_name}")
+        return None
+
+
+def get_router_maps_lazy(_path, _name):
+    """
+    Like get_router_maps, but defers importing each sub-app until its loader is called.
+    :return: mapping of mount prefix to a zero-argument loader returning the router or None
+    """
+    loaders = {}
     for module in pkgutil.iter_modules(_path):
         if not module.ispkg:
             continue
-        try:
-            sub_app = import_module(f"{_name}.{module.name}.router")
-            router = getattr(sub_app, "router", None)
-            if router:
-                if module.name == "default":
-                    router_map[""] = router
-                else:
-                    router_map[f"/{module.name}"] = router
-        except Exception as e:
-            print(e)
-    return router_map
+        prefix = "" if module.name == "default" else f"/{module.name}"
+        loaders[prefix] = cache(partial(_load_router, f"{_name}.{module.name}.router"))
+    return loaders
 
 
 class APIRouter(APIRouterBase):
@@ -1,6 +1,9 @@
 import logging
+from functools import partial
 
-from .api_proxy import APIProxy
+from .api_proxy import APIProxy, _shared_proxy
+
+_SCOPE_KEYS = {"data_hall": "data_halls", "chiller_plant": "chiller_plants"}
 
 
 class AppOrAuthServiceClient:
@@ -9,7 +12,11 @@ class AppOrAuthServiceClient:
             logging.error("auth_url is empty")
             raise ValueError("APIProxy base_url cannot be empty")
         self.auth_url = auth_url
-        self.api_proxy = APIProxy(base_url=auth_url)
+        # Built per dependency call, so the proxy (and its connection pool) is
+        # shared per event loop rather than owned by this instance
+        self.api_proxy = _shared_proxy(
+            "auth", partial(APIProxy, base_url=auth_url), base_url=auth_url
+        )
 
     def __getattr__(self, item):
         return getattr(self.api_proxy, item)
@@ -24,9 +31,17 @@ class AppOrAuthServiceClient:
 
     @staticmethod
     def extract_bearer(request):
-        if "Authorization" in request.headers:
-            return request.headers["Authorization"].replace("Bearer ", "")
-        return None
+        state = getattr(request, "state", None)
+        bearer = getattr(state, "_bearer", None)
+        if bearer is not None:
+            return bearer
+        bearer = request.headers.get("Authorization")
+        if not bearer:
+            return None
+        bearer = bearer.removeprefix("Bearer ")
+        if state is not None:
+            state._bearer = bearer
+        return bearer
 
     async def get_self_scopes(self, bearer: str = None, request=None):
         if not bearer and request:
@@ -37,10 +52,10 @@ class AppOrAuthServiceClient:
         resp = await self.api_proxy.auth.get("/authz/objects", bearer=bearer)
 
         for item in resp["result"]:
-            if item.startswith("data_hall."):
-                res["data_halls"].append(item.split(".")[1])
-            elif item.startswith("chiller_plant."):
-                res["chiller_plants"].append(item.split(".")[1])
+            prefix, sep, suffix = item.partition(".")
+            key = _SCOPE_KEYS.get(prefix) if sep else None
+            if key:
+                res[key].append(suffix.partition(".")[0])
         return res
 
     async def get_self_profile(self, bearer: str = None, request=None):
@@ -1,30 +1,62 @@
+import atexit
 import importlib.resources
+from contextlib import ExitStack, asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
-import uvicorn
-from dynaconf import Dynaconf
-from fastapi import FastAPI
-from typer import Typer, Option
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
-from .log_formatter import initialize_logger
-from .app import set_config
-from .error import setup_exception_handlers
+_file_manager = ExitStack()
+atexit.register(_file_manager.close)
 
 
+@lru_cache(maxsize=1)
 def get_log_config_path():
-    # Extract the file to a temporary location if needed
-    with importlib.resources.path("dcwiz_app_utils", "log_config.yaml") as path:
-        return path
+    # Extract the file to a temporary location if needed, kept until exit
+    resource = importlib.resources.files("dcwiz_app_utils") / "log_config.yaml"
+    return _file_manager.enter_context(importlib.resources.as_file(resource))
+
+
+def _wrap_lifespan(app: "FastAPI") -> None:
+    """
+    Warm and close the shared API proxies around the app's own lifespan. Startup
+    and shutdown event handlers are ignored when the app is given a lifespan, so
+    the proxies hook into the lifespan context instead.
+    """
+    from .api_proxy import close_api_proxies, warm_api_proxy
+
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app_):
+        try:
+            async with app_lifespan(app_) as state:
+                await warm_api_proxy()
+                yield state
+        finally:
+            await close_api_proxies()
+
+    app.router.lifespan_context = lifespan
+
+
+@lru_cache(maxsize=16)
+def _load_config(config_path: str, envvar_prefix: str):
+    from dynaconf import Dynaconf
+
+    return Dynaconf(settings_files=[config_path], envvar_prefix=envvar_prefix)
 
 
 def create_cli_main(
-    make_app: Callable[[...], FastAPI],
+    make_app: Callable[[...], "FastAPI"],
     envvar_prefix: str = "DCWIZ_APP",
     default_config: str | Path = "config/config.toml",
     **kwargs,
 ):
     def main():
+        from typer import Typer, Option
+
         typer_app = Typer()
 
         @typer_app.command()
@@ -38,11 +70,21 @@ def create_cli_main(
             root_path: str = Option(
                 "", "--root-path", "-r", help="Root path for use behind reverse proxy"
             ),
+            access_log: bool = Option(
+                True, "--access-log/--no-access-log", help="Emit uvicorn access logs"
+            ),
         ):
-            config = Dynaconf(settings_files=[config_path], envvar_prefix=envvar_prefix)
+            import uvicorn
+
+            from .app import set_config
+            from .error import setup_exception_handlers
+            from .log_formatter import initialize_logger
+
+            config = _load_config(str(config_path), envvar_prefix)
             set_config(config)
             auth_app = make_app(**kwargs)
             setup_exception_handlers(auth_app)
+            _wrap_lifespan(auth_app)
             initialize_logger(loglevel)
 
             uvicorn.run(
@@ -52,6 +94,10 @@ def create_cli_main(
                 log_level=loglevel,
                 root_path=root_path,
                 log_config=str(get_log_config_path()),
+                access_log=access_log,
+                # uvloop/httptools are picked up when installed (speedups extra)
+                loop="auto",
+                http="auto",
             )
 
         typer_app()
@@ -1,19 +1,125 @@
+import asyncio
+import threading
+import weakref
 from contextlib import contextmanager, asynccontextmanager
+from typing import AsyncIterator, Iterator, Sequence
 
 from redis import Redis
-from sqlalchemy import create_engine, select
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import Engine, create_engine, insert, inspect, make_url, select, tuple_
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql import ClauseElement
+
+from ._loop import on_loop_shutdown
 
 DBBase = declarative_base()
 
+_engine_cache: dict[str, tuple[Engine, sessionmaker]] = {}
+# Pooled async connections belong to the loop that opened them, so async engines
+# are kept per running loop (None: created outside of any loop)
+_async_engine_cache: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+_unbound_async_engines: dict[str, tuple[AsyncEngine, async_sessionmaker]] = {}
+_engine_lock = threading.Lock()
+_redis_clients: dict[tuple, Redis] = {}
+_redis_clients_by_config = weakref.WeakKeyDictionary()
+_redis_lock = threading.Lock()
+_get_config = None
+
+
+def _resolve_config(config=None):
+    global _get_config
+    if config is not None:
+        return config
+    if _get_config is None:
+        from .app import get_config
+
+        _get_config = get_config
+    return _get_config()
+
+
+def _get_engine(uri: str) -> tuple[Engine, sessionmaker]:
+    entry = _engine_cache.get(uri)
+    if entry is None:
+        with _engine_lock:
+            entry = _engine_cache.get(uri)
+            if entry is None:
+                engine = create_engine(uri, pool_pre_ping=True)
+                entry = _engine_cache[uri] = (
+                    engine,
+                    sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                )
+    return entry
+
+
+def _async_engine_options(config) -> dict:
+    return {
+        "pool_size": config.get("sqlalchemy.pool_size", 20),
+        "max_overflow": config.get("sqlalchemy.max_overflow", 10),
+        "pool_pre_ping": config.get("sqlalchemy.pool_pre_ping", True),
+        "pool_recycle": config.get("sqlalchemy.pool_recycle", 1800),
+    }
+
+
+async def _dispose_async_engines(loop):
+    with _engine_lock:
+        engines = _async_engine_cache.pop(loop, None) or {}
+    for engine, _ in engines.values():
+        await engine.dispose()
+
+
+def _loop_async_engines() -> dict[str, tuple[AsyncEngine, async_sessionmaker]]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _unbound_async_engines
+    engines = _async_engine_cache.get(loop)
+    if engines is None:
+        with _engine_lock:
+            engines = _async_engine_cache.get(loop)
+            if engines is None:
+                engines = _async_engine_cache[loop] = {}
+                on_loop_shutdown(_dispose_async_engines)
+    return engines
+
+
+def _get_async_engine(uri: str, **options) -> tuple[AsyncEngine, async_sessionmaker]:
+    """
+    Engine per URI and running event loop, disposed when the loop shuts down;
+    options (including pool sizing, so pools are per loop) only apply to the first
+    call for a URI on a loop.
+    """
+    engines = _loop_async_engines()
+    entry = engines.get(uri)
+    if entry is None:
+        with _engine_lock:
+            entry = engines.get(uri)
+            if entry is None:
+                options.setdefault("pool_pre_ping", True)
+                if make_url(uri).get_backend_name() == "sqlite":
+                    # sqlite uses a static/null pool which takes no sizing
+                    options.pop("pool_size", None)
+                    options.pop("max_overflow", None)
+                engine = create_async_engine(uri, **options)
+                entry = engines[uri] = (
+                    engine,
+                    async_sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                )
+    return entry
+
 
 class DBMixin:
     @classmethod
     async def get(cls, session, **query):
-        q = select(cls).filter_by(**query)
+        q = select(cls).filter_by(**query).limit(1)
         result = await session.execute(q)
-        return result.scalars().first()
+        return result.scalar_one_or_none()
 
     @classmethod
     async def list(cls, session, **query):
@@ -21,12 +127,28 @@ class DBMixin:
         result = await session.execute(q)
         return result.scalars().all()
 
-    async def update(self, session, **kwargs):
+    async def update(self, session, *, refresh: bool = None, **kwargs):
+        """
+        Set attributes and commit.
+        :param refresh: reload the row after commit; by default only when the session
+            expires on commit, a value is a SQL expression, or the table has
+            onupdate columns
+        """
         for k, v in kwargs.items():
             setattr(self, k, v)
         session.add(self)
         await session.commit()
-        await session.refresh(self)
+        if refresh is None:
+            refresh = (
+                getattr(session, "sync_session", session).expire_on_commit
+                or any(isinstance(v, ClauseElement) for v in kwargs.values())
+                or any(
+                    c.onupdate is not None or c.server_onupdate is not None
+                    for c in self.__table__.columns
+                )
+            )
+        if refresh:
+            await session.refresh(self)
 
     @classmethod
     async def add(cls, session, **kwargs):
@@ -36,6 +158,33 @@ class DBMixin:
         await session.refresh(obj)
         return obj
 
+    @classmethod
+    async def bulk_add(cls, session, rows: Sequence[dict]):
+        """
+        Insert many rows in one statement and return the created objects in order.
+        :param session: async session
+        :param rows: column values, one dict per row
+        :return: list of created objects
+        """
+        if not rows:
+            return []
+        pk_cols = inspect(cls).primary_key
+        dialect = session.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            # RETURNING rows only follow the parameter order when asked to
+            stmt = insert(cls).returning(*pk_cols, sort_by_parameter_order=True)
+            result = await session.execute(stmt, rows)
+            pks = [tuple(r) for r in result]
+        else:
+            objs = [cls(**r) for r in rows]
+            session.add_all(objs)
+            await session.flush()
+            pks = [inspect(o).identity for o in objs]
+        await session.commit()
+        result = await session.execute(select(cls).where(tuple_(*pk_cols).in_(pks)))
+        by_pk = {inspect(o).identity: o for o in result.scalars()}
+        return [by_pk[pk] for pk in pks]
+
     async def delete(self, session):
         await session.delete(self)
         await session.commit()
@@ -43,10 +192,7 @@ class DBMixin:
 
 class WithDB:
     def __init__(self, *args, sql_uri=None, **kwargs):
-        self.db_engine = create_engine(sql_uri)
-        self.session_cls = sessionmaker(
-            autocommit=False, autoflush=False, bind=self.db_engine
-        )
+        self.db_engine, self.session_cls = _get_engine(sql_uri)
         super().__init__(*args, **kwargs)
 
     @contextmanager
@@ -57,23 +203,36 @@ class WithDB:
         finally:
             session.close()
 
+    def get_session(self) -> Iterator[Session]:
+        """
+        Request-scoped session, for use as a FastAPI dependency: Depends(db.get_session)
+        """
+        with self.session_cls() as session:
+            yield session
+
     @classmethod
     def from_config(cls, config=None):
-        if config is None:
-            from .app import get_config
-
-            config = get_config()
+        config = _resolve_config(config)
         return cls(sql_uri=config["sqlalchemy.url"])
 
 
 class WithAsyncDB:
-    def __init__(self, *args, sql_uri=None, **kwargs):
-        self.db_engine = create_async_engine(sql_uri)
-        self.session_cls = async_sessionmaker(
-            autocommit=False, autoflush=False, bind=self.db_engine
-        )
+    def __init__(self, *args, sql_uri=None, engine_options=None, **kwargs):
+        self.sql_uri = sql_uri
+        self.engine_options = engine_options or {}
         super().__init__(*args, **kwargs)
 
+    @property
+    def db_engine(self) -> AsyncEngine:
+        """
+        Engine of the running event loop
+        """
+        return _get_async_engine(self.sql_uri, **self.engine_options)[0]
+
+    @property
+    def session_cls(self) -> async_sessionmaker:
+        return _get_async_engine(self.sql_uri, **self.engine_options)[1]
+
     @asynccontextmanager
     async def db_session(self):
         session = self.session_cls()
@@ -82,23 +241,26 @@ class WithAsyncDB:
         finally:
             await session.close()
 
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Request-scoped session, for use as a FastAPI dependency: Depends(db.get_session)
+        """
+        async with self.session_cls() as session:
+            yield session
+
     @classmethod
     def from_config(cls, config=None):
-        if config is None:
-            from .app import get_config
-
-            config = get_config()
-        return cls(sql_uri=config["sqlalchemy.url"])
+        config = _resolve_config(config)
+        return cls(
+            sql_uri=config["sqlalchemy.url"],
+            engine_options=_async_engine_options(config),
+        )
 
 
 @contextmanager
 def db_session_from_config(config=None):
-    if config is None:
-        from .app import get_config
-
-        config = get_config()
-    engine = create_engine(config["sqlalchemy.url"])
-    session_cls = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    config = _resolve_config(config)
+    _, session_cls = _get_engine(config["sqlalchemy.url"])
     session = session_cls()
     try:
         yield session
@@ -108,12 +270,10 @@ def db_session_from_config(config=None):
 
 @asynccontextmanager
 async def async_db_session_from_config(config=None):
-    if config is None:
-        from .app import get_config
-
-        config = get_config()
-    engine = create_async_engine(config["sqlalchemy.url"])
-    session_cls = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    config = _resolve_config(config)
+    _, session_cls = _get_async_engine(
+        config["sqlalchemy.url"], **_async_engine_options(config)
+    )
     session = session_cls()
     try:
         yield session
@@ -121,17 +281,50 @@ async def async_db_session_from_config(config=None):
         await session.close()
 
 
+def get_redis_client(config=None) -> Redis:
+    """
+    Shared Redis client for the configured server; its connection pool is reused
+    across calls, so do not close it. The client is memoized per config object, so
+    redis.* settings changed after the first call are not picked up.
+    """
+    config = _resolve_config(config)
+    try:
+        client = _redis_clients_by_config.get(config)
+    except TypeError:
+        # Plain dicts cannot be weakly referenced; skip the per-config memo
+        memo = False
+    else:
+        memo = True
+        if client is not None:
+            return client
+    key = (
+        config.get("redis.host", "localhost"),
+        config.get("redis.port", 6379),
+        config.get("redis.db", 0),
+        config.get("redis.password", None),
+        config.get("redis.decode_responses", False),
+    )
+    client = _redis_clients.get(key)
+    if client is None:
+        with _redis_lock:
+            client = _redis_clients.get(key)
+            if client is None:
+                host, port, db, password, decode_responses = key
+                client = _redis_clients[key] = Redis(
+                    host=host,
+                    port=port,
+                    db=db,
+                    password=password,
+                    decode_responses=decode_responses,
+                )
+    if memo:
+        _redis_clients_by_config[config] = client
+    return client
+
+
 @contextmanager
 def redis_from_config(config=None):
-    if config is None:
-        from .app import get_config
-
-        config = get_config()
-    redis = Redis(
-        host=config.get("redis.host", "localhost"),
-        port=config.get("redis.port", 6379),
-        db=config.get("redis.db", 0),
-        password=config.get("redis.password", None),
-    )
-    yield redis
-    redis.close()
+    """
+    Deprecated. Use get_redis_client instead.
+    """
+    yield get_redis_client(config)
@@ -2,14 +2,17 @@
 This module defines various exception classes and exception handlers for error handling in the DCWiz application.
 """
 
+import inspect
 from enum import Enum
-from json import JSONDecodeError
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator
 
-from fastapi import HTTPException
-from fastapi.responses import JSONResponse
-from httpx import Response as HttpxResponse, ConnectError
+import orjson
 from pydantic import BaseModel, Field
+from starlette.responses import JSONResponse, Response
+
+if TYPE_CHECKING:
+    from httpx import Response as HttpxResponse
 
 
 class ErrorCode(str, Enum):
@@ -39,6 +42,19 @@ class ErrorSeverity(str, Enum):
     DEBUG = "Debug"
 
 
+def _dumps(content) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson
+    """
+
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
+
 class Error(BaseModel):
     """
     Represents an error.
@@ -58,6 +74,65 @@ class Error(BaseModel):
     error_message_variables: dict = Field(None, description="Error message variables")
 
 
+_SEV_ERROR = ErrorSeverity.ERROR.value
+_CODE_API = ErrorCode.ERR_API_ERROR.value
+_CODE_DATA = ErrorCode.ERR_DATA_ERROR.value
+_CODE_INTERNAL = ErrorCode.ERR_INTERNAL_ERROR.value
+_CODE_AUTH = ErrorCode.ERR_AUTH_ERROR.value
+
+
+def _make_error(
+    type_: str,
+    message: str | dict = None,
+    severity: str = _SEV_ERROR,
+    error_message_key: str = None,
+    error_message_variables: dict = None,
+) -> dict:
+    """
+    Build the serialized form of an Error without pydantic validation
+    """
+    return dict(
+        type=type_,
+        severity=severity,
+        message=message,
+        error_message_key=error_message_key,
+        error_message_variables=error_message_variables,
+    )
+
+
+_ALLOWED_ERROR_KEYS = (
+    "type",
+    "severity",
+    "message",
+    "error_message_key",
+    "error_message_variables",
+)
+
+
+def _passthrough_error(e: dict) -> dict:
+    """
+    Copy an error entry from an upstream DCWiz service, which already follows the
+    Error schema, without validating it
+    """
+    error = {k: e.get(k) for k in _ALLOWED_ERROR_KEYS}
+    if error["severity"] is None:
+        error["severity"] = _SEV_ERROR
+    return error
+
+
+def _group_errors(summary, errors) -> Iterator[dict]:
+    """
+    Errors of one exception group member, each message prefixed with the summary
+    """
+    if not errors:
+        yield _make_error("Unknown", summary, error_message_key=_CODE_INTERNAL)
+        return
+    prefix = summary.rstrip(".!") + ": "
+    for error in errors:
+        error["message"] = prefix + str(error.get("message") or "")
+        yield error
+
+
 class DCWizException(Exception):
     """
     Base exception class for DCWiz application.
@@ -65,13 +140,31 @@ class DCWizException(Exception):
 
     @classmethod
     async def exception_handler_and_response(cls, _, exc):
-        return JSONResponse(**await cls.exception_handler(_, exc))
+        # Dispatch on the raised type so subclasses registered through a base
+        # class still use their own handler
+        result = await _call_exception_handler(type(exc), _, exc)
+        return Response(
+            content=_dumps(result["content"]),
+            status_code=result["status_code"],
+            media_type="application/json",
+        )
 
     @classmethod
-    async def exception_handler(cls, _, exc):
+    def exception_handler(cls, _, exc):
+        """
+        Return dict(status_code=..., content=...) for the exception; may also be
+        implemented as a coroutine function
+        """
         raise NotImplementedError("Must be implemented by subclass")
 
 
+async def _call_exception_handler(exc_type, request, exc) -> dict:
+    result = exc_type.exception_handler(request, exc)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
 class DCWizServiceException(DCWizException):
     """
     Exception class for DCWiz service-level errors.
@@ -103,7 +196,7 @@ class DCWizServiceException(DCWizException):
         self.error_message_variables = error_message_variables
 
     @staticmethod
-    async def exception_handler(_, exc, **kwargs):
+    def exception_handler(_, exc, **kwargs):
         content = dict(
             message=exc.message or "Internal Service Error",
             error_message_key=exc.error_message_key,
@@ -114,11 +207,86 @@ class DCWizServiceException(DCWizException):
             ]
         return dict(status_code=exc.status_code, content=content)
 
+    def iter_errors(self) -> Iterator[dict]:
+        """
+        Errors to report when this exception is part of an exception group
+        """
+        errors = self.errors and [
+            e.dict() if not isinstance(e, dict) else dict(e) for e in self.errors
+        ]
+        yield from _group_errors(self.message or "Internal Service Error", errors)
+
+
+_UNPARSED = object()
+
+
+_BODY_FRAMING_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+def _detach_response(response: "HttpxResponse") -> "HttpxResponse":
+    """
+    Copy of a read response with its request, status, headers and body, so a
+    pending exception does not keep the stream and connection objects alive.
+    Anything else (other response types, unread streams) is kept as is.
+    """
+    from httpx import Response, ResponseNotRead
+
+    if not isinstance(response, Response):
+        return response
+    try:
+        content = response.content
+    except ResponseNotRead:
+        return response
+    try:
+        request = response.request
+    except RuntimeError:
+        request = None
+    # The body is stored decoded; its framing headers are recomputed for the copy
+    headers = [
+        (k, v)
+        for k, v in response.headers.multi_items()
+        if k not in _BODY_FRAMING_HEADERS
+    ]
+    return Response(
+        response.status_code,
+        headers=headers,
+        content=content,
+        request=request,
+        default_encoding=response.encoding or "utf-8",
+    )
+
+
+def _default_api_message(exc) -> str:
+    return "Error %sing %s, get status code %d" % (
+        exc.method,
+        exc._url_str,
+        exc.response.status_code,
+    )
+
+
+def _build_api_error(exc, code, extract) -> dict:
+    """
+    Shared handler body for DCWizAPIException and its subclasses
+    :param exc: exception instance
+    :param code: top-level error_message_key
+    :param extract: returns the default message and the error list (or None) for exc
+    :return: dict with status_code and content
+    """
+    message, errors = extract(exc)
+    content = dict(error_message_key=code, message=exc.message or message)
+    if errors is not None:
+        content["errors"] = errors
+    return dict(status_code=exc.response.status_code, content=content)
+
 
 class DCWizAPIException(DCWizException):
     """
     Exception class for handling API errors in the DCWiz application.
 
+    Subclasses customize the response through default_error_message_key and _extract.
+
     Attributes:
         method (str): The HTTP method used for the request.
         url (str): The URL of the request.
@@ -129,30 +297,46 @@ class DCWizAPIException(DCWizException):
         exception_handler: A static method that handles the exception and returns a response.
     """
 
-    def __init__(self, method, url, response: HttpxResponse, message=None):
+    default_error_message_key = ErrorCode.ERR_INTERNAL_ERROR
+
+    def __init__(self, method, url, response: "HttpxResponse", message=None):
         super().__init__()
         self.method = method
         self.url = url
-        self.response = response
+        self._url_str = str(url)
+        self.response = _detach_response(response)
         self.message = message
-        self.error_message_key = ErrorCode.ERR_INTERNAL_ERROR
+        self.error_message_key = self.default_error_message_key
+        self._parsed_json = _UNPARSED
+
+    @property
+    def parsed_json(self):
+        """
+        Response body decoded as JSON, or the raw text if it is not JSON; parsed once
+        """
+        if self._parsed_json is _UNPARSED:
+            try:
+                self._parsed_json = orjson.loads(self.response.content)
+            except orjson.JSONDecodeError:
+                self._parsed_json = self.response.text
+        return self._parsed_json
 
     @staticmethod
-    async def exception_handler(_, exc, **kwargs):
-        status_code = exc.response.status_code
-        content = dict(
-            error_message_key=exc.response.error_message_key,
-            message=exc.message
-            or f"Error {exc.method}ing {exc.url}, get status code {status_code}",
-            errors=[
-                Error(
-                    type="API Error",
-                    severity=ErrorSeverity.ERROR,
-                    message=exc.response.text,
-                ).dict()
-            ],
-        )
-        return dict(status_code=status_code, content=content)
+    def _extract(exc):
+        if not exc.response.content:
+            return _default_api_message(exc), None
+        return _default_api_message(exc), [_make_error("API Error", exc.response.text)]
+
+    @staticmethod
+    def exception_handler(_, exc, **kwargs):
+        return _build_api_error(exc, exc.error_message_key, type(exc)._extract)
+
+    def iter_errors(self) -> Iterator[dict]:
+        """
+        Errors to report when this exception is part of an exception group
+        """
+        message, errors = type(self)._extract(self)
+        yield from _group_errors(self.message or message, errors)
 
 
 class DCWizPlatformAPIException(DCWizAPIException):
@@ -160,30 +344,14 @@ class DCWizPlatformAPIException(DCWizAPIException):
     Exception class for handling errors related to the DCWiz platform API.
     """
 
+    default_error_message_key = _CODE_API
+
     @staticmethod
-    async def exception_handler(_, exc, **kwargs):
-        status_code = exc.response.status_code
-        try:
-            error = exc.response.json()
-        except JSONDecodeError:
-            error = exc.response.text
-        content = dict(
-            error_message_key=ErrorCode.ERR_API_ERROR,
-            message=exc.message
-            or f"Error {exc.method}ing {exc.url}, get status code {status_code}",
-            errors=[
-                Error(
-                    error_message_key=ErrorCode.ERR_API_ERROR,
-                    type="API Error",
-                    severity=ErrorSeverity.ERROR,
-                    message=error,
-                ).dict()
-            ],
-        )
-        return dict(
-            status_code=status_code,
-            content=content,
-        )
+    def _extract(exc):
+        errors = [
+            _make_error("API Error", exc.parsed_json, error_message_key=_CODE_API)
+        ]
+        return _default_api_message(exc), errors
 
 
 class DCWizDataAPIException(DCWizAPIException):
@@ -191,48 +359,42 @@ class DCWizDataAPIException(DCWizAPIException):
     Exception class for handling errors related to the DCWiz Data API (Utinni).
     """
 
+    default_error_message_key = _CODE_DATA
+
     @staticmethod
-    async def exception_handler(_, exc, **kwargs):
-        try:
-            error = exc.response.json()
-            if isinstance(error["detail"], list):
-                errors = [
-                    Error(
-                        error_message_key=ErrorCode.ERR_DATA_ERROR,
-                        type="Data Error",
-                        severity=ErrorSeverity.ERROR,
-                        message=f"{k}:{v}",
-                    ).dict()
-                    for k, v in error["detail"]
-                ]
-            else:
-                errors = [
-                    Error(
-                        error_message_key=ErrorCode.ERR_DATA_ERROR,
-                        type="Data Error",
-                        severity=ErrorSeverity.ERROR,
-                        message=str(error["detail"]),
-                    ).dict()
-                ]
-        except JSONDecodeError:
+    def _extract(exc):
+        error = exc.parsed_json
+        if not isinstance(error, dict):
             errors = [
-                Error(
-                    error_message_key=ErrorCode.ERR_API_ERROR,
-                    type="API Error",
-                    severity=ErrorSeverity.ERROR,
-                    message=exc.response.text,
-                ).dict()
+                _make_error(
+                    "API Error",
+                    exc.response.text,
+                    error_message_key=_CODE_API,
+                )
             ]
-        content = dict(
-            error_message_key=ErrorCode.ERR_DATA_ERROR,
-            message=exc.message
-            or f"Data Error: {exc.method} {exc.url}: {exc.response.status_code}",
-            errors=errors,
-        )
-        return dict(
-            status_code=exc.response.status_code,
-            content=content,
+        elif isinstance(error["detail"], list):
+            errors = [
+                _make_error(
+                    "Data Error",
+                    f"{k}:{v}",
+                    error_message_key=_CODE_DATA,
+                )
+                for k, v in error["detail"]
+            ]
+        else:
+            errors = [
+                _make_error(
+                    "Data Error",
+                    str(error["detail"]),
+                    error_message_key=_CODE_DATA,
+                )
+            ]
+        message = "Data Error: %s %s: %d" % (
+            exc.method,
+            exc._url_str,
+            exc.response.status_code,
         )
+        return message, errors
 
 
 class DCWizServiceAPIException(DCWizAPIException):
@@ -240,19 +402,17 @@ class DCWizServiceAPIException(DCWizAPIException):
     Exception class for handling errors from the DCWiz service API.
     """
 
+    default_error_message_key = _CODE_API
+
     @staticmethod
-    async def exception_handler(_, exc, **kwargs):
-        error = exc.response.json()
-        content = dict(
-            error_message_key=ErrorCode.ERR_API_ERROR,
-            message=exc.message or error["message"],
-        )
-        if "errors" in error:
-            content["errors"] = [Error(**e).dict() for e in error["errors"]]
-        return dict(
-            status_code=exc.response.status_code,
-            content=content,
-        )
+    def _extract(exc):
+        error = exc.parsed_json
+        if not isinstance(error, dict):
+            return error, None
+        errors = error.get("errors")
+        if errors is not None:
+            errors = [_passthrough_error(e) for e in errors]
+        return error.get("message"), errors
 
 
 class DCWizAuthException(DCWizAPIException):
@@ -260,149 +420,153 @@ class DCWizAuthException(DCWizAPIException):
     Exception class for handling authentication errors in the DCWiz application.
     """
 
+    default_error_message_key = _CODE_AUTH
+
     @staticmethod
-    async def exception_handler(_, exc, **kwargs):
+    def _extract(exc):
         if exc.response.status_code == 401:
             message = "Not Authenticated, please login."
         else:
             message = "Not Authorized, please use a different account."
-        error = exc.response.json()
-        content = dict(
-            error_message_key=ErrorCode.ERR_AUTH_ERROR,
-            message=exc.message or message,
-        )
-        if "errors" in error:
-            content["errors"] = [Error(**e).dict() for e in error["errors"]]
-        return dict(
-            status_code=exc.response.status_code,
-            content=content,
-        )
+        error = exc.parsed_json
+        if isinstance(error, dict) and "errors" in error:
+            return message, [_passthrough_error(e) for e in error["errors"]]
+        return message, None
 
 
-async def http_exception_handler(_, exc):
+@lru_cache(maxsize=256)
+def _render_http_error(message: str) -> bytes:
     """
-    Exception Handler for HTTP errors
-    :param exc: Exception object
-    :return: JSON response with error
+    Render the JSON body for an HTTP error, memoized per message
+    :param message: error message
+    :return: serialized response body
     """
-    message = str(exc.detail)
     content = dict(
-        error_message_key=ErrorCode.ERR_INTERNAL_ERROR,
+        error_message_key=_CODE_INTERNAL,
         message=message,
         errors=[
-            Error(
-                error_message_key=ErrorCode.ERR_INTERNAL_ERROR,
-                type="HTTP Error",
-                message=message,
-                severity=ErrorSeverity.ERROR,
-            ).dict()
+            _make_error(
+                "HTTP Error",
+                message,
+                error_message_key=_CODE_INTERNAL,
+            )
         ],
     )
-    return JSONResponse(status_code=exc.status_code, content=content)
+    return _dumps(content)
 
 
-async def connect_error_handler(request, exc):
+async def http_exception_handler(_, exc):
     """
-    Exception Handler for Connection failure
-    :param request: Request object
+    Exception Handler for HTTP errors
     :param exc: Exception object
     :return: JSON response with error
     """
+    return Response(
+        content=_render_http_error(str(exc.detail)),
+        status_code=exc.status_code,
+        media_type="application/json",
+    )
+
+
+def _connect_error(url, exc) -> tuple[int, dict]:
     content = dict(
-        error_message_key=ErrorCode.ERR_API_ERROR,
+        error_message_key=_CODE_API,
         message="Connection Error",
         errors=[
-            Error(
-                error_message_key=ErrorCode.ERR_API_ERROR,
-                type="Connection Error",
-                message=f"{str(exc)}: {request.url}",
-                severity=ErrorSeverity.ERROR,
-            ).dict()
+            _make_error(
+                "Connection Error",
+                f"{str(exc)}: {url}",
+                error_message_key=_CODE_API,
+            )
         ],
     )
-    return JSONResponse(status_code=503, content=content)
+    return 503, content
 
 
-async def exception_group_handler(_, exc):
+async def connect_error_handler(request, exc):
     """
-    Exception Handler for Exception Groups
+    Exception Handler for Connection failure
+    :param request: Request object
     :param exc: Exception object
     :return: JSON response with error
     """
+    status_code, content = _connect_error(request.url, exc)
+    return ORJSONResponse(status_code=status_code, content=content)
+
+
+@lru_cache(maxsize=None)
+def _has_exception_handler(exc_type: type) -> bool:
+    return issubclass(exc_type, (DCWizAPIException, DCWizServiceException))
+
+
+async def _exception_group_error(exc) -> tuple[int, dict]:
+    if len(exc.exceptions) == 1:
+        inner_exc = exc.exceptions[0]
+        if _has_exception_handler(type(inner_exc)):
+            # A lone DCWiz error renders as if it had been raised directly
+            result = await _call_exception_handler(type(inner_exc), None, inner_exc)
+            return result["status_code"], result["content"]
     errors = []
-    status_code = (
-        exc.exceptions[0].status_code
-        if len(exc.exceptions) == 1
-        and isinstance(exc.exceptions[0], DCWizServiceException)
-        else 500
-    )
     for inner_exc in exc.exceptions:
-        if isinstance(inner_exc, DCWizAPIException) or isinstance(
-            inner_exc, DCWizServiceException
-        ):
-            result = await inner_exc.exception_handler(_, inner_exc)
-            summary = result["content"]["message"]
-            inner_errors: list[Any] = result["content"].get("errors", [])
-            if not inner_errors:
-                errors.append(
-                    Error(
-                        error_message_key=ErrorCode.ERR_INTERNAL_ERROR,
-                        type="Unknown",
-                        message=summary,
-                        severity=ErrorSeverity.ERROR,
-                    ).dict()
-                )
-            for error in inner_errors:
-                error["message"] = (
-                    f"{summary.rstrip('.!')}: {error.get('message', None)}"
-                )
-            errors.extend(inner_errors)
+        if _has_exception_handler(type(inner_exc)):
+            errors.extend(inner_exc.iter_errors())
         else:
             errors.append(
-                Error(
-                    error_message_key=ErrorCode.ERR_INTERNAL_ERROR,
-                    type="Unknown Exception Group",
-                    message=str(inner_exc),
-                    severity=ErrorSeverity.ERROR,
-                ).dict()
+                _make_error(
+                    "Unknown Exception Group",
+                    str(inner_exc),
+                    error_message_key=_CODE_INTERNAL,
+                )
             )
     content = dict(
         message="Multiple Errors" if len(errors) > 1 else errors[0]["message"],
         errors=errors,
     )
-    if len(exc.exceptions) == 1 and isinstance(
-        exc.exceptions[0], DCWizServiceException
-    ):
-        content["error_message_key"] = exc.exceptions[0].error_message_key
+    return 500, content
+
+
+async def exception_group_handler(_, exc):
+    """
+    Exception Handler for Exception Groups
+    :param exc: Exception object
+    :return: JSON response with error
+    """
+    status_code, content = await _exception_group_error(exc)
+    return ORJSONResponse(status_code=status_code, content=content)
+
+
+@lru_cache(maxsize=1)
+def _exception_handlers() -> tuple:
+    from fastapi import HTTPException
+    from httpx import ConnectError
+
+    return (
+        (
+            DCWizServiceException,
+            DCWizServiceException.exception_handler_and_response,
+        ),
+        (DCWizAPIException, DCWizAPIException.exception_handler_and_response),
+        (HTTPException, http_exception_handler),
+        (ConnectError, connect_error_handler),
+        (ExceptionGroup, exception_group_handler),
+    )
 
-    return JSONResponse(status_code=status_code, content=content)
+
+def __getattr__(name):
+    # EXCEPTION_HANDLERS is built on first access, so importing this module does
+    # not load fastapi or httpx
+    if name == "EXCEPTION_HANDLERS":
+        return _exception_handlers()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def setup_exception_handlers(app) -> None:
     """
-    Setup handlers for all app level exception
+    Setup handlers for all app level exception, one
+    app.add_exception_handler(exc_type, handler) per EXCEPTION_HANDLERS entry.
+    Registered as exception handlers rather than as a middleware so the error
+    responses still pass through the app's own middleware (CORS, ...)
     :param app: App instance
     """
-    app.add_exception_handler(
-        DCWizServiceException, DCWizServiceException.exception_handler_and_response
-    )
-    app.add_exception_handler(
-        DCWizAPIException, DCWizAPIException.exception_handler_and_response
-    )
-    app.add_exception_handler(
-        DCWizPlatformAPIException,
-        DCWizPlatformAPIException.exception_handler_and_response,
-    )
-    app.add_exception_handler(
-        DCWizDataAPIException, DCWizDataAPIException.exception_handler_and_response
-    )
-    app.add_exception_handler(
-        DCWizServiceAPIException,
-        DCWizServiceAPIException.exception_handler_and_response,
-    )
-    app.add_exception_handler(
-        DCWizAuthException, DCWizAuthException.exception_handler_and_response
-    )
-    app.add_exception_handler(HTTPException, http_exception_handler)
-    app.add_exception_handler(ConnectError, connect_error_handler)
-    app.add_exception_handler(ExceptionGroup, exception_group_handler)
+    for exc_type, handler in _exception_handlers():
+        app.add_exception_handler(exc_type, handler)
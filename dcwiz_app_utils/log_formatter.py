@@ -2,6 +2,11 @@ import logging
 import os
 from logging.handlers import TimedRotatingFileHandler
 import re
+import threading
+
+_ANSI_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+# Match whole bracketed sections
+_BRACKET_RE = re.compile(r"([\[\{\(\<][^\]\}\)\>]*[\]\}\)\>])")
 
 
 def initialize_logger(level=logging.INFO, fmt=""):
@@ -30,7 +35,7 @@ def initialize_logger(level=logging.INFO, fmt=""):
         encoding="utf-8",
     )
     log_handler.setLevel(level)
-    log_handler.setFormatter(CustomFormatter(fmt))
+    log_handler.setFormatter(PlainFormatter(fmt))
     logger.addHandler(log_handler)
     logger.addHandler(stdout_handler)
 
@@ -48,6 +53,13 @@ def initialize_logger(level=logging.INFO, fmt=""):
 
 
 class CustomRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    Timed rotating file handler with a buffered stream. Records are flushed every
+    flush_interval seconds, immediately from flush_level upwards, and on close.
+    Once closed (e.g. by a later dictConfig) the handler may still be reopened by
+    an emit; without the flush thread every record is then flushed right away.
+    """
+
     def __init__(
         self,
         filename,
@@ -59,13 +71,68 @@ class CustomRotatingFileHandler(TimedRotatingFileHandler):
         utc=False,
         atTime=None,
         errors=None,
+        buffer_size=65536,
+        flush_interval=5.0,
+        flush_level=logging.WARNING,
     ):
         directory = os.path.dirname(filename)
         if directory:
             os.makedirs(directory, exist_ok=True)
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        # Set while no flush thread runs; logging.Handler owns the _closed name
+        self._stop_flush = threading.Event()
+        self._stop_flush.set()
         super().__init__(
             filename, when, interval, backupCount, encoding, delay, utc, atTime, errors
         )
+        if flush_interval:
+            self._stop_flush.clear()
+            threading.Thread(
+                target=self._flush_periodically,
+                args=(flush_interval,),
+                name="log-flush",
+                daemon=True,
+            ).start()
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def flush(self):
+        # StreamHandler.emit flushes after every record; defer to the timer if any
+        if self._stop_flush.is_set():
+            self.flush_now()
+
+    def flush_now(self):
+        with self.lock:
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= self.flush_level:
+            self.flush_now()
+
+    def _flush_periodically(self, interval):
+        while not self._stop_flush.wait(interval):
+            self.flush_now()
+
+    def close(self):
+        self._stop_flush.set()
+        super().close()
+
+
+class PlainFormatter(logging.Formatter):
+    """Uncolored counterpart of CustomFormatter, for file output"""
+
+    def __init__(self, fmt=""):
+        super().__init__(fmt or "%(asctime)s | %(levelname)s | %(message)s")
 
 
 class CustomFormatter(logging.Formatter):
@@ -100,34 +167,44 @@ class CustomFormatter(logging.Formatter):
             logging.ERROR: self.red,
             logging.CRITICAL: self.bold_red,
         }
+        # Apply color to entire bracketed section
+        self._bracket_repl = rf"{self.bracket_color}\1{self.reset}{self.white}"
+        # Formatters are built once per level rather than for every record
+        if self.fmt:
+            self._formatters = {
+                level: logging.Formatter(log_fmt)
+                for level, log_fmt in self.FORMATS.items()
+            }
+            self._default_formatter = logging.Formatter()
+        else:
+            self._formatters = {
+                level: self._colored_formatter(color)
+                for level, color in self.LEVEL_COLOR.items()
+            }
+            self._default_formatter = self._colored_formatter("")
+
+    def _colored_formatter(self, level_color):
+        return logging.Formatter(
+            f"{self.cyan}%(asctime)s{self.reset} |"
+            f" {level_color}%(levelname)s{self.reset} |"
+            f" {self.white}%(message)s{self.reset}"
+        )
 
     @staticmethod
     def remove_ansi_escape_sequences(text):
         """Remove ANSI escape sequences from the text to avoid nested coloring issues."""
-        ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-        return ansi_escape.sub("", text)
+        return _ANSI_RE.sub("", text)
 
     def format(self, record):
-        level_color = self.LEVEL_COLOR.get(record.levelno)
-        time_color = self.cyan
-        message_color = self.white
-
-        if not self.fmt:
-            if record.msg:
-                record.msg = self.remove_ansi_escape_sequences(record.msg)
-
-                record.msg = re.sub(
-                    r"([\[\{\(\<][^\]\}\)\>]*[\]\}\)\>])",  # Match whole bracketed sections
-                    rf"{self.bracket_color}\1{self.reset}{message_color}",  # Apply color to entire section
-                    record.msg,
-                )
-
-            formatter = logging.Formatter(
-                f"{time_color}%(asctime)s{self.reset} |"
-                f" {level_color}%(levelname)s{self.reset} |"
-                f" {message_color}%(message)s{self.reset}"
-            )
-        else:
-            log_fmt = self.FORMATS.get(record.levelno)
-            formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        formatter = self._formatters.get(record.levelno, self._default_formatter)
+        if self.fmt or not record.msg:
+            return formatter.format(record)
+        # Color a copy of the message so other handlers see the record unchanged
+        msg = record.msg
+        record.msg = _BRACKET_RE.sub(
+            self._bracket_repl, self.remove_ansi_escape_sequences(msg)
+        )
+        try:
+            return formatter.format(record)
+        finally:
+            record.msg = msg
@@ -1,4 +1,4 @@
-from functools import wraps
+from functools import lru_cache, wraps
 from inspect import isclass
 from types import GenericAlias
 
@@ -22,7 +22,22 @@ class ResponseBase(BaseModel):
     errors: list[Error] = Field(None, description="List of errors")
 
 
-_response_wrapper_cache = {}
+@lru_cache(maxsize=None)
+def _build_response_model(base_model_type, many: bool) -> Type[ResponseBase]:
+    extra_name = ""
+    if (
+        not isinstance(base_model_type, GenericAlias)
+        and get_origin(base_model_type) is list
+    ):
+        # typing.List[X]: name the model after X
+        item_type = get_args(base_model_type)[0]
+        extra_name = getattr(item_type, "__name__", str(item_type)).split(".")[-1]
+    if many:
+        name = f"{base_model_type.__name__}ListResponse" + extra_name
+    else:
+        name = f"{base_model_type.__name__}Response" + extra_name
+    result_field = (list[base_model_type], None) if many else (base_model_type, None)
+    return pydantic.create_model(name, __base__=ResponseBase, result=result_field)
 
 
 def response_wrapper(base_model_type=None) -> Type[ResponseBase]:
@@ -32,30 +47,8 @@ def response_wrapper(base_model_type=None) -> Type[ResponseBase]:
         isinstance(base_model_type, GenericAlias)
         and get_origin(base_model_type) is list
     ):
-        many = True
-        base_model_type = get_args(base_model_type)[0]
-    else:
-        many = False
-    extra_name = ""
-    if base_model_type.__name__ == "List":
-        extra_name = str(base_model_type).split("[")[1].split("]")[0].split(".")[-1]
-    if many:
-        name = f"{base_model_type.__name__}ListResponse" + extra_name
-    else:
-        name = f"{base_model_type.__name__}Response" + extra_name
-    if name not in _response_wrapper_cache:
-        if base_model_type is None:
-            _response_wrapper_cache[name] = pydantic.create_model(
-                name, __base__=ResponseBase
-            )
-        else:
-            result_field = (
-                (list[base_model_type], None) if many else (base_model_type, None)
-            )
-            _response_wrapper_cache[name] = pydantic.create_model(
-                name, __base__=ResponseBase, result=result_field
-            )
-    return _response_wrapper_cache[name]
+        return _build_response_model(get_args(base_model_type)[0], True)
+    return _build_response_model(base_model_type, False)
 
 
 def wrap_response(message=None):
@@ -68,13 +61,20 @@ def wrap_response(message=None):
         response_model = response_wrapper(ret_type)
         func.__annotations__["return"] = response_model
 
-        @wraps(func)
-        async def wrapped(*args, **kwargs):
-            result = await func(*args, **kwargs)
-            display_message = message if message is not None else ""
-            if ret_type is None:
+        display_message = message if message is not None else ""
+
+        if ret_type is None:
+
+            @wraps(func)
+            async def wrapped(*args, **kwargs):
+                await func(*args, **kwargs)
                 return response_model(message=display_message)
-            else:
+
+        else:
+
+            @wraps(func)
+            async def wrapped(*args, **kwargs):
+                result = await func(*args, **kwargs)
                 return response_model(message=display_message, result=result)
 
         return wrapped
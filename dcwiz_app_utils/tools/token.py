@@ -45,6 +45,24 @@ class App(FastAPI):
 app = App()
 app.add_middleware(SessionMiddleware, secret_key="0")
 
+_client: httpx.AsyncClient | None = None
+
+
+async def _open_client():
+    global _client
+    _client = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=20))
+
+
+async def _close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+app.add_event_handler("startup", _open_client)
+app.add_event_handler("shutdown", _close_client)
+
 
 @app.get("/")
 async def index():
@@ -72,7 +90,7 @@ async def auth(request: Request):
 @app.get("/logout")
 async def logout(request: Request):
     if app.token_cache:
-        httpx.post(
+        await _client.post(
             f"{app.auth_url}/users/logout",
             headers=dict(Authorization=f"Bearer {app.token_cache['refresh_token']}"),
         )
@@ -84,7 +102,7 @@ async def logout(request: Request):
 async def profile():
     if app.token_cache is None:
         return RedirectResponse(url="/login")
-    res = httpx.get(
+    res = await _client.get(
         f"{app.auth_url}/users/profile",
         headers=dict(Authorization=f"Bearer {app.token_cache['id_token']}"),
     )
@@ -100,7 +118,7 @@ async def profile():
 async def token():
     if app.token_cache is None:
         return RedirectResponse(url="/login")
-    res = httpx.get(
+    res = await _client.get(
         f"{app.auth_url}/users/profile",
         headers=dict(Authorization=f"Bearer {app.token_cache['id_token']}"),
     )
@@ -111,7 +129,7 @@ async def token():
 
 @app.get("/list-users")
 async def list_users():
-    resp = httpx.get(
+    resp = await _client.get(
         f"{app.auth_url}/users/",
         headers=dict(Authorization=f"Bearer {app.token_cache['id_token']}"),
     )
@@ -0,0 +1,39 @@
+import pandas as pd
+from dynaconf import Dynaconf
+
+from dcwiz_app_utils.api_proxy import APIProxy, get_api_proxy
+
+
+def test_to_dataframe_records():
+    df = APIProxy._to_dataframe([{"a": 1, "b": "x"}, {"a": 2, "b": "y"}])
+    assert df.to_dict(orient="list") == {"a": [1, 2], "b": ["x", "y"]}
+
+
+def test_to_dataframe_scalar_list():
+    df = APIProxy._to_dataframe([1, 2, 3])
+    assert df[0].tolist() == [1, 2, 3]
+
+
+def test_to_dataframe_ragged_lists():
+    df = APIProxy._to_dataframe([[1, 2], [3]])
+    assert df.shape == (2, 2)
+
+
+def test_to_dataframe_casts_present_dtypes_only():
+    df = APIProxy._to_dataframe({"a": [1]}, {"a": "float32", "missing": "int8"})
+    assert df.dtypes.to_dict() == {"a": pd.Series(dtype="float32").dtype}
+
+
+def _platform_config(**platform):
+    return Dynaconf(platform={"base_url": "http://platform.local", **platform})
+
+
+def test_get_api_proxy_shares_equal_settings_only():
+    proxy = get_api_proxy(_platform_config(timeout=5))
+    assert get_api_proxy(_platform_config(timeout=5)) is proxy
+    other = get_api_proxy(_platform_config(timeout=30))
+    assert other is not proxy
+    assert (proxy.timeout, other.timeout) == (5, 30)
+    authed = get_api_proxy(_platform_config(timeout=5, username="u", password="p"))
+    assert authed is not proxy
+    assert authed.auth_info is not None
@@ -0,0 +1,27 @@
+import gzip
+
+import httpx
+
+from dcwiz_app_utils.error import _detach_response
+
+
+def test_detach_response_recomputes_body_headers():
+    request = httpx.Request("GET", "http://example.com/a")
+    body = gzip.compress(b"hello world")
+    response = httpx.Response(
+        500,
+        content=body,
+        headers={"content-encoding": "gzip", "content-length": str(len(body))},
+        request=request,
+    )
+    detached = _detach_response(response)
+    assert detached.content == b"hello world"
+    assert detached.headers["content-length"] == "11"
+    assert "content-encoding" not in detached.headers
+    assert detached.url == request.url
+
+
+def test_detach_response_without_request():
+    detached = _detach_response(httpx.Response(404, content=b"missing"))
+    assert detached.status_code == 404
+    assert detached.text == "missing"
@@ -0,0 +1,65 @@
+import logging
+import logging.config
+import time
+
+import pytest
+import yaml
+
+from dcwiz_app_utils.cli import get_log_config_path
+from dcwiz_app_utils.log_formatter import CustomRotatingFileHandler, initialize_logger
+
+
+@pytest.fixture
+def isolated_logging(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    names = ("uvicorn", "uvicorn.error", "uvicorn.access")
+    root = logging.getLogger()
+    saved = {
+        name: (lg.handlers[:], lg.level, lg.propagate)
+        for name, lg in [("", root)] + [(n, logging.getLogger(n)) for n in names]
+    }
+    yield tmp_path
+    for name, (handlers, level, propagate) in saved.items():
+        lg = logging.getLogger(name or None)
+        for handler in lg.handlers:
+            if handler not in handlers:
+                handler.close()
+        lg.handlers[:] = handlers
+        lg.setLevel(level)
+        lg.propagate = propagate
+
+
+def _wait_for(path, text, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists() and text in path.read_text(encoding="utf-8"):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def test_app_log_survives_uvicorn_dict_config(isolated_logging):
+    initialize_logger("INFO")
+    with open(get_log_config_path(), encoding="utf-8") as f:
+        logging.config.dictConfig(yaml.safe_load(f))
+
+    logging.getLogger("dcwiz.test").info("record after dictConfig")
+
+    assert _wait_for(isolated_logging / "log" / "app.log", "record after dictConfig", 6)
+
+
+def test_flush_interval_flushes_buffered_records(isolated_logging):
+    handler = CustomRotatingFileHandler("log/buffered.log", flush_interval=0.2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        handler.handle(logging.makeLogRecord({"msg": "buffered", "levelno": 20}))
+        assert _wait_for(isolated_logging / "log" / "buffered.log", "buffered", 2)
+    finally:
+        handler.close()
+
+
+def test_close_twice(isolated_logging):
+    handler = CustomRotatingFileHandler("log/twice.log")
+    handler.close()
+    handler.close()
+    logging.shutdown([lambda: handler])